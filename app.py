@@ -1,25 +1,79 @@
-from fastapi import FastAPI, UploadFile, File, Form, BackgroundTasks, status
-from fastapi.responses import Response
+from fastapi import FastAPI, UploadFile, File, Form, Request, status
+from fastapi.responses import Response, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 from typing import Optional
 from contextlib import asynccontextmanager
 from src.controller import create_entries, poll_sessions
+from src.admission import admission, client_key
+from src.image_preprocessing import validate_submission
+from src.pose_estimate_module import PoseCheckUnavailable
+from src.config import OVERLOAD_RETRY_AFTER, SHUTDOWN_JOB_TIMEOUT
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic: e.g. start poll_sessions as a background task
     task = asyncio.create_task(poll_sessions())
     yield
-    # Shutdown logic: stop the polling task
+    # Shutdown logic: let admitted avatar jobs finish, then stop the polling task
+    await admission.drain(SHUTDOWN_JOB_TIMEOUT)
     task.cancel()
     try:
         await task
     except asyncio.CancelledError:
         pass
 
+class AdmissionMiddleware:
+    """
+    Rate limit and capacity check for POST /new-avatar, done before the
+    uploads are received so rejected clients get a 429/503 right away.
+    The in-flight slot is released here unless the handler handed it to a job.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] != "/new-avatar":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        retry_after = admission.check_rate(
+            client_key(request.headers.get("x-api-key"), request.client.host if request.client else None)
+        )
+        if retry_after:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Rate limit exceeded"},
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        if not admission.try_start_job():
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is at capacity, try again later"},
+                headers={"Retry-After": str(OVERLOAD_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        slot = {"handed_off": False}
+        request.state.admission_slot = slot
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if not slot["handed_off"]:
+                admission.finish_job()
+
+
 app = FastAPI(lifespan=lifespan)
 
+# Added before CORS so CORS headers are also set on 429/503 responses
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,10 +83,14 @@ app.add_middleware(
 )
 
 
+@app.get("/utilization")
+async def utilization():
+    return admission.utilization()
+
 
 @app.post("/new-avatar", status_code=status.HTTP_201_CREATED)
 async def new_avatar(
-    background_tasks: BackgroundTasks,
+    request: Request,
     front_view: UploadFile = File(...),
     side_view: UploadFile = File(...),
     back_view: UploadFile = File(...),
@@ -43,6 +101,23 @@ async def new_avatar(
     side_bytes = await side_view.read()
     back_bytes = await back_view.read()
 
+    try:
+        problems = await validate_submission(front_bytes, side_bytes, back_bytes)
+    except PoseCheckUnavailable as e:
+        print(f"Pose pre-check failed: {e}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Photo checks are temporarily unavailable, try again later"},
+            headers={"Retry-After": str(OVERLOAD_RETRY_AFTER)},
+        )
+
+    if problems:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content={"detail": "Submitted photos are not usable", "reasons": problems},
+        )
 
-    background_tasks.add_task(create_entries, front_bytes, side_bytes, back_bytes, height, gender)
+    admission.spawn_job(create_entries(front_bytes, side_bytes, back_bytes, height, gender))
+    # The job owns the in-flight slot from here on and releases it when done
+    request.state.admission_slot["handed_off"] = True
     return Response(status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,140 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from typing import Optional
+
+from .config import RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, MAX_INFLIGHT_JOBS, CLIENT_API_KEYS
+
+
+def client_key(api_key: Optional[str], host: Optional[str], known_keys: set = CLIENT_API_KEYS) -> str:
+    """
+    Rate limit bucket key for a caller. Only configured API keys get their own
+    bucket, otherwise a client could send a fresh random key on every request.
+    """
+    if api_key and api_key in known_keys:
+        return f"key:{api_key}"
+    return f"ip:{host or 'unknown'}"
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: int):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available and returns 0.
+        Otherwise returns the number of seconds until the next token.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Per-client token buckets plus a global cap on in-flight avatar jobs.
+    Everything runs on the event loop, so plain counters are enough.
+    """
+
+    def __init__(self, per_minute: int, burst: int, max_inflight: int):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self.buckets: dict[str, TokenBucket] = {}
+        self.rejected_rate_limited = 0
+        self.rejected_overloaded = 0
+        self.tasks: set[asyncio.Task] = set()
+
+    def _bucket(self, client_key: str) -> TokenBucket:
+        bucket = self.buckets.get(client_key)
+        if bucket is None:
+            self._evict_idle()
+            bucket = self.buckets[client_key] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    def _evict_idle(self):
+        # A bucket that has been idle long enough to refill completely is
+        # indistinguishable from a fresh one, so it can be dropped.
+        now = time.monotonic()
+        idle = [
+            key for key, bucket in self.buckets.items()
+            if bucket.tokens + (now - bucket.updated) * bucket.rate >= bucket.capacity
+        ]
+        for key in idle:
+            del self.buckets[key]
+
+    def check_rate(self, client_key: str) -> int:
+        """Returns 0 if admitted, otherwise the Retry-After in seconds."""
+        wait = self._bucket(client_key).try_acquire()
+        if wait:
+            self.rejected_rate_limited += 1
+            return max(1, math.ceil(wait))
+        return 0
+
+    def try_start_job(self) -> bool:
+        if self.inflight >= self.max_inflight:
+            self.rejected_overloaded += 1
+            return False
+        self.inflight += 1
+        return True
+
+    def finish_job(self):
+        assert self.inflight > 0, "in-flight slot released twice"
+        self.inflight -= 1
+
+    def spawn_job(self, coro) -> asyncio.Task:
+        """
+        Runs an admitted job on the loop. The slot is released when the task
+        finishes, whether or not the HTTP response was delivered.
+        """
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._job_done)
+        return task
+
+    async def drain(self, timeout: float):
+        """Waits for running jobs to finish, used on shutdown."""
+        if not self.tasks:
+            return
+        print(f"Waiting for {len(self.tasks)} avatar job(s) to finish...")
+        _, pending = await asyncio.wait(set(self.tasks), timeout=timeout)
+        if pending:
+            print(f"{len(pending)} avatar job(s) still running after {timeout}s, shutting down anyway")
+
+    def _job_done(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        self.finish_job()
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Avatar job failed: {task.exception()}")
+
+    def utilization(self) -> dict:
+        return {
+            "inflight_jobs": self.inflight,
+            "max_inflight_jobs": self.max_inflight,
+            "utilization": round(self.inflight / self.max_inflight, 2) if self.max_inflight else 1.0,
+            "tracked_clients": len(self.buckets),
+            "rate_limit_per_minute": self.per_minute,
+            "rate_limit_burst": self.burst,
+            "rejected_rate_limited": self.rejected_rate_limited,
+            "rejected_overloaded": self.rejected_overloaded,
+        }
+
+
+admission = AdmissionController(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_BURST, MAX_INFLIGHT_JOBS)
+
+# CPU bound image work for admitted jobs runs here instead of on the event loop
+cpu_executor = ThreadPoolExecutor(max_workers=MAX_INFLIGHT_JOBS, thread_name_prefix="avatar-cpu")
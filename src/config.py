@@ -8,4 +8,24 @@ CUBE_URL = config('CUBE_URL', default='https://api.csm.ai')
 CUBE_API_KEY = config('CUBE_API_KEY', default='')
 POCKETBASE_URL = config('POCKETBASE_URL', default='https://fittingroom.hatchwise.me')
 REGISTER_URL = config('POCKETBASE_URL', default='https://register.hatchwise.me')
-SIZE_URL = config('SIZE_URL', default='https://size.hatchwise.me')
\ No newline at end of file
+SIZE_URL = config('SIZE_URL', default='https://size.hatchwise.me')
+
+# Admission control for /new-avatar
+# Comma separated API keys that get their own rate limit bucket; any other
+# caller is limited by IP. Run uvicorn with --proxy-headers and
+# FORWARDED_ALLOW_IPS set to the reverse proxy so the IP is the real client's.
+CLIENT_API_KEYS = config('CLIENT_API_KEYS', default='', cast=lambda v: {k.strip() for k in v.split(',') if k.strip()})
+RATE_LIMIT_PER_MINUTE = config('RATE_LIMIT_PER_MINUTE', default=6, cast=int)
+RATE_LIMIT_BURST = config('RATE_LIMIT_BURST', default=3, cast=int)
+# Number of avatar jobs processed at once. It also sizes the worker pool that
+# runs rembg, so it should match the CPU capacity for background removal
+# (onnxruntime already uses several threads per call).
+MAX_INFLIGHT_JOBS = config('MAX_INFLIGHT_JOBS', default=2, cast=int)
+OVERLOAD_RETRY_AFTER = config('OVERLOAD_RETRY_AFTER', default=30, cast=int)
+# Seconds to wait for running avatar jobs on shutdown
+SHUTDOWN_JOB_TIMEOUT = config('SHUTDOWN_JOB_TIMEOUT', default=120, cast=int)
+
+# Early validation of submitted photos
+ALLOWED_IMAGE_FORMATS = config('ALLOWED_IMAGE_FORMATS', default='JPEG,PNG,WEBP', cast=lambda v: [f.strip().upper() for f in v.split(',')])
+MIN_IMAGE_SIDE = config('MIN_IMAGE_SIDE', default=256, cast=int)
+MAX_IMAGE_SIDE = config('MAX_IMAGE_SIDE', default=8000, cast=int)
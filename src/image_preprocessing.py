@@ -1,10 +1,13 @@
+import asyncio
 from rembg import remove
 from PIL import Image
 from io import BytesIO
 
-from .pose_estimate_module import extract_measurements_from_images_with_bytes
+from .pose_estimate_module import extract_measurements_from_images_with_bytes, precheck_pose
+from .admission import cpu_executor
+from .image_validation import check_image_header
 
-async def remove_background(image_bytes: bytes) -> bytes:
+def _remove_background_sync(image_bytes: bytes) -> bytes:
     # Use rembg to remove background
     output = remove(image_bytes)
 
@@ -14,7 +17,24 @@ async def remove_background(image_bytes: bytes) -> bytes:
     img.save(byte_io, format="PNG")
     return byte_io.getvalue()
 
+async def remove_background(image_bytes: bytes) -> bytes:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, _remove_background_sync, image_bytes)
+
 async def get_measurements(front: bytes, side: bytes, height: int) -> dict:
-    measurements = extract_measurements_from_images_with_bytes(front, side, height)
+    loop = asyncio.get_running_loop()
+    measurements = await loop.run_in_executor(cpu_executor, extract_measurements_from_images_with_bytes, front, side, height)
     
-    return measurements 
\ No newline at end of file
+    return measurements
+
+
+async def validate_submission(front: bytes, side: bytes, back: bytes) -> list:
+    problems = []
+    for name, image_bytes in (("front_view", front), ("side_view", side), ("back_view", back)):
+        problems.extend(check_image_header(name, image_bytes))
+    if problems:
+        return problems
+
+    # Pose detection is CPU bound, keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(cpu_executor, precheck_pose, front, side)
@@ -0,0 +1,26 @@
+from PIL import Image
+from io import BytesIO
+
+from .config import ALLOWED_IMAGE_FORMATS, MIN_IMAGE_SIDE, MAX_IMAGE_SIDE
+
+
+def check_image_header(name: str, image_bytes: bytes) -> list:
+    # Image.open only parses the header, the pixel data is not decoded here
+    try:
+        with Image.open(BytesIO(image_bytes)) as img:
+            image_format, (width, height) = img.format, img.size
+    except Exception:
+        return [f"{name}: not a readable image"]
+
+    # Phone cameras often save multi-picture JPEGs, which Pillow reports as MPO
+    if image_format == "MPO":
+        image_format = "JPEG"
+
+    problems = []
+    if image_format not in ALLOWED_IMAGE_FORMATS:
+        problems.append(f"{name}: unsupported format {image_format}, expected one of {', '.join(ALLOWED_IMAGE_FORMATS)}")
+    if min(width, height) < MIN_IMAGE_SIDE:
+        problems.append(f"{name}: image too small ({width}x{height}), minimum side is {MIN_IMAGE_SIDE}px")
+    if max(width, height) > MAX_IMAGE_SIDE:
+        problems.append(f"{name}: image too large ({width}x{height}), maximum side is {MAX_IMAGE_SIDE}px")
+    return problems
@@ -1,11 +1,20 @@
 import cv2
 import mediapipe as mp
 import numpy as np
+from io import BytesIO
 from math import sqrt, pi
+from typing import Optional
+from PIL import Image
 
 mp_pose = mp.solutions.pose
 LND = mp_pose.PoseLandmark
 
+SIDE_VIEW_KEY_PAIRS = [
+    (LND.LEFT_SHOULDER, LND.RIGHT_SHOULDER),
+    (LND.LEFT_HIP, LND.RIGHT_HIP),
+    (LND.LEFT_ANKLE, LND.RIGHT_ANKLE),
+]
+
 
 def extract_measurements_from_images(front_img_path: str,
                                      side_img_path : str,
@@ -45,6 +54,60 @@ def extract_measurements_from_images_with_bytes(front_bytes: bytes,
     return _calculate_measurements(kp_front, kp_side, height_cm, w_front, h_front, w_side, h_side)
 
 
+class PoseCheckUnavailable(RuntimeError):
+    """The pose model could not be run, so photos cannot be checked."""
+
+
+# Model 1 is the one bundled with the mediapipe wheel; 0 and 2 are
+# downloaded on first use, which the request path must not depend on.
+PRECHECK_MODEL_COMPLEXITY = 1
+PRECHECK_MAX_SIDE = 512
+
+
+def _precheck_landmarks(image_bytes: bytes):
+    try:
+        return _get_landmarks_from_bytes(image_bytes,
+                                         model_complexity=PRECHECK_MODEL_COMPLEXITY,
+                                         max_side=PRECHECK_MAX_SIDE)
+    except ValueError:
+        return None
+    except Exception as e:
+        raise PoseCheckUnavailable(str(e)) from e
+
+
+def precheck_pose(front_bytes: bytes, side_bytes: bytes) -> list:
+    """
+    Cheap pose check run before any heavy processing.
+    Uses the bundled pose model on downscaled images and the same rules as
+    _assess_measurement_quality. Returns a list of reasons to reject the
+    submission (empty if the photos are usable). Raises PoseCheckUnavailable
+    if the pose model itself fails.
+    """
+    problems = []
+    kp_front = _precheck_landmarks(front_bytes)
+    if kp_front is None:
+        problems.append("front_view: no person detected")
+    kp_side = _precheck_landmarks(side_bytes)
+    if kp_side is None:
+        problems.append("side_view: no person detected")
+
+    if kp_front is not None and kp_side is not None:
+        quality = _assess_measurement_quality(kp_front, kp_side)
+        # A missing shoulder, hip or ankle means the photo is not full-body
+        not_full_body = [issue for issue in quality["issues"] if issue.startswith("Low visibility")]
+        if quality["score"] == "poor" or not_full_body:
+            problems.extend(f"front_view: {issue}" for issue in quality["issues"])
+
+    if kp_side is not None:
+        # In profile one side of the body is hidden, so only one landmark of
+        # each shoulder/hip/ankle pair has to be visible
+        for left, right in SIDE_VIEW_KEY_PAIRS:
+            if max(kp_side[left].visibility, kp_side[right].visibility) < 0.5:
+                problems.append(f"side_view: Low visibility: {left.name.split('_', 1)[1]}")
+
+    return problems
+
+
 def _calculate_measurements(kp_front, kp_side, height_cm, w_front, h_front, w_side, h_side):
     """Enhanced measurement calculations with better accuracy and additional metrics."""
     
@@ -212,15 +275,44 @@ def _get_landmarks(img_path: str):
         return res.pose_landmarks.landmark
 
 
-def _get_landmarks_from_bytes(image_bytes: bytes):
+def _reduced_decode_flag(image_bytes: bytes, max_side: Optional[int]) -> int:
+    """
+    Picks the largest OpenCV decode-time reduction that still leaves the
+    longest side at least max_side, so big photos are never decoded in full.
+    """
+    if max_side is None:
+        return cv2.IMREAD_COLOR
+    try:
+        with Image.open(BytesIO(image_bytes)) as img:
+            longest = max(img.size)
+    except Exception:
+        return cv2.IMREAD_COLOR
+
+    for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                         (4, cv2.IMREAD_REDUCED_COLOR_4),
+                         (2, cv2.IMREAD_REDUCED_COLOR_2)):
+        if longest // factor >= max_side:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def _get_landmarks_from_bytes(image_bytes: bytes, model_complexity: int = 2, max_side: Optional[int] = None):
     file_bytes = np.frombuffer(image_bytes, np.uint8)
-    img_bgr = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+    img_bgr = cv2.imdecode(file_bytes, _reduced_decode_flag(image_bytes, max_side))
     if img_bgr is None:
         raise ValueError("Invalid image bytes")
+
+    # Optionally downscale; landmarks are normalized so this does not affect them
+    if max_side is not None:
+        h, w = img_bgr.shape[:2]
+        scale = max_side / max(h, w)
+        if scale < 1:
+            img_bgr = cv2.resize(img_bgr, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
     img_rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
 
     # Use higher model complexity for better accuracy
-    with mp_pose.Pose(static_image_mode=True, model_complexity=2) as pose:
+    with mp_pose.Pose(static_image_mode=True, model_complexity=model_complexity) as pose:
         res = pose.process(img_rgb)
         if not res.pose_landmarks:
             raise ValueError("No landmarks detected in image")
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from src import admission as admission_module
+from src.admission import AdmissionController, TokenBucket, client_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    bucket = TokenBucket(rate_per_sec=0.1, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(10)
+
+    clock[0] += 10
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+
+def test_bucket_never_exceeds_capacity(clock):
+    bucket = TokenBucket(rate_per_sec=1, capacity=2)
+    clock[0] += 3600
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+
+def test_retry_after_is_rounded_up_to_whole_seconds(clock):
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+    assert controller.check_rate("ip:a") == 0
+
+    clock[0] += 0.5
+    # 9.5s until the next token
+    assert controller.check_rate("ip:a") == 10
+
+    clock[0] += 9.4
+    # 0.1s left still asks for at least a second
+    assert controller.check_rate("ip:a") == 1
+    assert controller.rejected_rate_limited == 2
+
+
+def test_clients_have_separate_buckets(clock):
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+    assert controller.check_rate("ip:a") == 0
+    assert controller.check_rate("ip:a") > 0
+    assert controller.check_rate("ip:b") == 0
+
+
+def test_idle_full_buckets_are_evicted(clock):
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+    controller.check_rate("ip:a")
+    controller.check_rate("ip:b")
+    assert set(controller.buckets) == {"ip:a", "ip:b"}
+
+    clock[0] += 5
+    controller.check_rate("ip:c")
+    assert set(controller.buckets) == {"ip:a", "ip:b", "ip:c"}
+
+    clock[0] += 9
+    controller.check_rate("ip:d")
+    assert set(controller.buckets) == {"ip:c", "ip:d"}
+
+
+def test_client_key_only_trusts_configured_api_keys():
+    known = {"tenant-key"}
+    assert client_key("tenant-key", "10.0.0.1", known) == "key:tenant-key"
+    assert client_key("random-key", "10.0.0.1", known) == "ip:10.0.0.1"
+    assert client_key(None, "10.0.0.1", known) == "ip:10.0.0.1"
+    assert client_key(None, None, known) == "ip:unknown"
+
+
+def test_inflight_cap():
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=2)
+    assert controller.try_start_job()
+    assert controller.try_start_job()
+    assert not controller.try_start_job()
+    assert controller.rejected_overloaded == 1
+
+    controller.finish_job()
+    assert controller.try_start_job()
+
+
+def test_utilization_reports_configured_values():
+    controller = AdmissionController(per_minute=6, burst=3, max_inflight=2)
+    controller.try_start_job()
+    report = controller.utilization()
+    assert report["rate_limit_per_minute"] == 6
+    assert isinstance(report["rate_limit_per_minute"], int)
+    assert report["inflight_jobs"] == 1
+    assert report["utilization"] == 0.5
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_spawned_job_releases_slot(fails):
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+
+    async def job():
+        await asyncio.sleep(0)
+        if fails:
+            raise RuntimeError("boom")
+
+    async def main():
+        assert controller.try_start_job()
+        task = controller.spawn_job(job())
+        assert controller.inflight == 1
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert controller.inflight == 0
+    assert not controller.tasks
+
+
+def test_double_release_is_an_error():
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+    controller.try_start_job()
+    controller.finish_job()
+    with pytest.raises(AssertionError):
+        controller.finish_job()
+
+
+def test_drain_waits_for_running_jobs():
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+    finished = []
+
+    async def job():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    async def main():
+        controller.try_start_job()
+        controller.spawn_job(job())
+        await controller.drain(timeout=5)
+
+    asyncio.run(main())
+    assert finished == [True]
+    assert controller.inflight == 0
+
+
+def test_drain_gives_up_after_timeout():
+    controller = AdmissionController(per_minute=6, burst=1, max_inflight=1)
+
+    async def main():
+        controller.try_start_job()
+        task = controller.spawn_job(asyncio.sleep(10))
+        await controller.drain(timeout=0.01)
+        assert not task.done()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(main())
+    assert controller.inflight == 0
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+pytest.importorskip("rembg")
+pytest.importorskip("mediapipe")
+from fastapi.testclient import TestClient
+
+import app as app_module
+from src.admission import AdmissionController
+
+
+def _jpeg() -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (400, 800), "white").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController(per_minute=600, burst=100, max_inflight=1)
+    monkeypatch.setattr(app_module, "admission", controller)
+
+    async def idle_poll():
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(app_module, "poll_sessions", idle_poll)
+    return controller
+
+
+def _post(client):
+    files = {name: (f"{name}.jpg", _jpeg(), "image/jpeg") for name in ("front_view", "side_view", "back_view")}
+    return client.post("/new-avatar", files=files, data={"height": "170", "gender": "Female"})
+
+
+def _wait_for_idle(controller, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while controller.inflight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _stub_validation(monkeypatch, problems):
+    async def validate(*args):
+        return problems
+
+    monkeypatch.setattr(app_module, "validate_submission", validate)
+
+
+def test_rejected_photos_release_slot(monkeypatch, controller):
+    _stub_validation(monkeypatch, ["front_view: no person detected"])
+
+    with TestClient(app_module.app) as client:
+        response = _post(client)
+
+    assert response.status_code == 422
+    assert response.json()["reasons"] == ["front_view: no person detected"]
+    assert controller.inflight == 0
+
+
+def test_validation_error_releases_slot(monkeypatch, controller):
+    async def validate(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(app_module, "validate_submission", validate)
+
+    with TestClient(app_module.app, raise_server_exceptions=False) as client:
+        response = _post(client)
+
+    assert response.status_code == 500
+    assert controller.inflight == 0
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_job_releases_slot_when_done(monkeypatch, controller, fails):
+    _stub_validation(monkeypatch, [])
+
+    async def create_entries(*args):
+        await asyncio.sleep(0.05)
+        if fails:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(app_module, "create_entries", create_entries)
+
+    with TestClient(app_module.app) as client:
+        assert _post(client).status_code == 201
+        assert controller.inflight == 1
+
+        busy = _post(client)
+        assert busy.status_code == 503
+        assert "Retry-After" in busy.headers
+
+        _wait_for_idle(controller)
+        assert controller.inflight == 0
+        assert _post(client).status_code == 201
+        _wait_for_idle(controller)
+
+
+def test_rate_limit_returns_429(monkeypatch, controller):
+    _stub_validation(monkeypatch, ["front_view: no person detected"])
+    monkeypatch.setattr(app_module, "admission", AdmissionController(per_minute=6, burst=1, max_inflight=1))
+
+    with TestClient(app_module.app) as client:
+        assert _post(client).status_code == 422
+        limited = _post(client)
+
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) >= 1
+
+
+def test_shutdown_waits_for_running_jobs(monkeypatch, controller):
+    _stub_validation(monkeypatch, [])
+    finished = []
+
+    async def create_entries(*args):
+        await asyncio.sleep(0.1)
+        finished.append(True)
+
+    monkeypatch.setattr(app_module, "create_entries", create_entries)
+
+    with TestClient(app_module.app) as client:
+        assert _post(client).status_code == 201
+
+    assert finished == [True]
+    assert controller.inflight == 0
+
+
+def test_missing_form_field_releases_slot(controller):
+    with TestClient(app_module.app) as client:
+        response = client.post("/new-avatar", data={"height": "170"})
+
+    assert response.status_code == 422
+    assert controller.inflight == 0
+
+
+@pytest.mark.parametrize("limited", ["rate", "capacity"])
+def test_rejection_does_not_read_the_upload(monkeypatch, controller, limited):
+    if limited == "rate":
+        monkeypatch.setattr(controller, "check_rate", lambda key: 7)
+    else:
+        monkeypatch.setattr(controller, "try_start_job", lambda: False)
+
+    async def inner_app(scope, receive, send):
+        raise AssertionError("request should not reach the endpoint")
+
+    async def receive():
+        raise AssertionError("request body should not be read")
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/new-avatar",
+        "headers": [], "client": ("10.0.0.1", 1234), "query_string": b"",
+    }
+    asyncio.run(app_module.AdmissionMiddleware(inner_app)(scope, receive, send))
+
+    start = sent[0]
+    assert start["status"] == (429 if limited == "rate" else 503)
+    assert any(name == b"retry-after" for name, _ in start["headers"])
+
+
+def test_pose_check_failure_returns_503(monkeypatch, controller):
+    async def validate(*args):
+        raise app_module.PoseCheckUnavailable("model failed to load")
+
+    monkeypatch.setattr(app_module, "validate_submission", validate)
+
+    with TestClient(app_module.app) as client:
+        response = _post(client)
+
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert controller.inflight == 0
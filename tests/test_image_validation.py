@@ -0,0 +1,40 @@
+from io import BytesIO
+
+from PIL import Image
+
+from src.image_validation import check_image_header
+
+
+def _image_bytes(size=(400, 800), image_format="JPEG", **save_kwargs) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format=image_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+def test_accepts_supported_formats():
+    for image_format in ("JPEG", "PNG", "WEBP"):
+        assert check_image_header("front_view", _image_bytes(image_format=image_format)) == []
+
+
+def test_accepts_mpo_as_jpeg():
+    frames = [Image.new("RGB", (400, 800), "white"), Image.new("RGB", (400, 800), "black")]
+    buffer = BytesIO()
+    frames[0].save(buffer, format="MPO", save_all=True, append_images=frames[1:])
+    assert Image.open(BytesIO(buffer.getvalue())).format == "MPO"
+
+    assert check_image_header("front_view", buffer.getvalue()) == []
+
+
+def test_rejects_unsupported_format():
+    problems = check_image_header("side_view", _image_bytes(image_format="GIF"))
+    assert len(problems) == 1
+    assert problems[0].startswith("side_view: unsupported format GIF")
+
+
+def test_rejects_too_small_and_too_large():
+    assert "too small" in check_image_header("front_view", _image_bytes(size=(100, 800)))[0]
+    assert "too large" in check_image_header("front_view", _image_bytes(size=(300, 9000), image_format="PNG"))[0]
+
+
+def test_rejects_unreadable_bytes():
+    assert check_image_header("back_view", b"not an image") == ["back_view: not a readable image"]
@@ -0,0 +1,86 @@
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from src import pose_estimate_module
+from src.pose_estimate_module import LND, precheck_pose, _reduced_decode_flag
+
+
+def _landmarks(hidden=()):
+    """A standing full-body pose with every landmark visible except `hidden`."""
+    points = [SimpleNamespace(x=0.5, y=0.1, visibility=0.99) for _ in LND]
+    for side, x in (("LEFT", 0.4), ("RIGHT", 0.6)):
+        for part, y in (("SHOULDER", 0.25), ("HIP", 0.5), ("ANKLE", 0.9)):
+            points[LND[f"{side}_{part}"]] = SimpleNamespace(x=x, y=y, visibility=0.99)
+    for landmark in hidden:
+        points[landmark].visibility = 0.1
+    return points
+
+
+@pytest.fixture
+def poses(monkeypatch):
+    detected = {}
+
+    def fake_landmarks(image_bytes, model_complexity=2, max_side=None):
+        if detected[image_bytes] is None:
+            raise ValueError("No landmarks detected in image")
+        return detected[image_bytes]
+
+    monkeypatch.setattr(pose_estimate_module, "_get_landmarks_from_bytes", fake_landmarks)
+    return detected
+
+
+def test_full_body_photos_pass(poses):
+    poses[b"front"], poses[b"side"] = _landmarks(), _landmarks()
+    assert precheck_pose(b"front", b"side") == []
+
+
+def test_no_person_detected(poses):
+    poses[b"front"], poses[b"side"] = None, None
+    assert precheck_pose(b"front", b"side") == [
+        "front_view: no person detected",
+        "side_view: no person detected",
+    ]
+
+
+def test_hidden_front_ankle_is_rejected(poses):
+    poses[b"front"], poses[b"side"] = _landmarks(hidden=[LND.LEFT_ANKLE]), _landmarks()
+    assert precheck_pose(b"front", b"side") == ["front_view: Low visibility: LEFT_ANKLE"]
+
+
+def test_profile_with_one_side_visible_passes(poses):
+    far_side = [LND.RIGHT_SHOULDER, LND.RIGHT_HIP, LND.RIGHT_ANKLE]
+    poses[b"front"], poses[b"side"] = _landmarks(), _landmarks(hidden=far_side)
+    assert precheck_pose(b"front", b"side") == []
+
+
+def test_profile_with_both_hips_hidden_is_rejected(poses):
+    poses[b"front"] = _landmarks()
+    poses[b"side"] = _landmarks(hidden=[LND.LEFT_HIP, LND.RIGHT_HIP])
+    assert precheck_pose(b"front", b"side") == ["side_view: Low visibility: HIP"]
+
+
+def test_model_failure_is_reported_as_unavailable(monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("model file missing")
+
+    monkeypatch.setattr(pose_estimate_module, "_get_landmarks_from_bytes", broken)
+    with pytest.raises(pose_estimate_module.PoseCheckUnavailable):
+        precheck_pose(b"front", b"side")
+
+
+def _jpeg(size) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_reduced_decode_flag():
+    assert _reduced_decode_flag(_jpeg((3000, 4000)), 512) == cv2.IMREAD_REDUCED_COLOR_4
+    assert _reduced_decode_flag(_jpeg((600, 800)), 512) == cv2.IMREAD_COLOR
+    assert _reduced_decode_flag(_jpeg((3000, 4000)), None) == cv2.IMREAD_COLOR